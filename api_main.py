@@ -1,15 +1,25 @@
 from __future__ import annotations
 
+import hashlib
 from io import BytesIO
 from typing import Optional
 
 import pandas as pd
 from fastapi import FastAPI, File, UploadFile, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 
-from trading_case.mtm_calculator import generate_daily_mtm_report
-from weather_case.weather_analysis import WeatherConfig, load_weather_data, answer_question
+from trading_case.mtm_calculator import compute_mtm_for_date, write_mtm_report
+from weather_case.weather_analysis import WeatherConfig, answer_question, load_daily_data, load_monthly_data
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _iter_chunks(buf: BytesIO, chunk_size: int = STREAM_CHUNK_SIZE):
+    buf.seek(0)
+    while chunk := buf.read(chunk_size):
+        yield chunk
 
 
 app = FastAPI(title="Case Study API", version="1.0.0")
@@ -36,15 +46,13 @@ async def trading_mtm(
     """
     try:
         contents = await file.read()
-        in_mem = BytesIO(contents)
-
-        # Use in-memory Excel with pandas
-        tmp_path = BytesIO(contents)
-        tmp_path.seek(0)
-        df = generate_daily_mtm_report(
-            excel_path=tmp_path,  # type: ignore[arg-type]
-            output_path=BytesIO(),  # discarded; we only use the DataFrame
+        digest = hashlib.sha1(contents).digest()
+
+        # Only the DataFrame is returned, so skip writing an Excel report.
+        df = compute_mtm_for_date(
+            excel_path=BytesIO(contents),  # type: ignore[arg-type]
             valuation_date=valuation_date,
+            cache_key=digest,  # repeated uploads of the same file reuse the parsed inputs
         )
 
         return {"rows": df.to_dict(orient="records")}
@@ -52,6 +60,41 @@ async def trading_mtm(
         return JSONResponse(status_code=400, content={"error": str(exc)})
 
 
+@app.post("/api/trading/mtm.xlsx")
+async def trading_mtm_xlsx(
+    file: UploadFile = File(..., description="Excel file with Price and Contracts sheets"),
+    valuation_date: Optional[str] = Form(
+        None,
+        description="Valuation date (YYYY-MM-DD). If omitted, uses latest price date in Price sheet.",
+    ),
+):
+    """
+    Compute MTM report for uploaded trading Excel and stream it back as an Excel file.
+    """
+    try:
+        contents = await file.read()
+        digest = hashlib.sha1(contents).digest()
+
+        df = compute_mtm_for_date(
+            excel_path=BytesIO(contents),  # type: ignore[arg-type]
+            valuation_date=valuation_date,
+            cache_key=digest,
+        )
+
+        # The xlsx zip is only complete once the workbook is closed, so write it first
+        # (rows are flushed by xlsxwriter as they go) and stream the result in chunks.
+        out = BytesIO()
+        write_mtm_report(df, out)
+
+        return StreamingResponse(
+            _iter_chunks(out),
+            media_type=XLSX_MEDIA_TYPE,
+            headers={"Content-Disposition": 'attachment; filename="MTM_valuation_report.xlsx"'},
+        )
+    except Exception as exc:
+        return JSONResponse(status_code=400, content={"error": str(exc)})
+
+
 @app.post("/api/weather/answer")
 async def weather_answer(
     file: UploadFile = File(..., description="Excel file with Daily and Monthly sheets"),
@@ -62,13 +105,18 @@ async def weather_answer(
     """
     try:
         contents = await file.read()
+        digest = hashlib.sha1(contents).digest()
         buf = BytesIO(contents)
         cfg = WeatherConfig(excel_path=buf)  # type: ignore[arg-type]
 
-        # load_weather_data accepts anything that pandas.ExcelFile accepts
-        daily_df, monthly_df = load_weather_data(cfg)
-
-        text_answer, table = answer_question(question, daily=daily_df, monthly=monthly_df, cfg=cfg)
+        # The loaders accept anything that pandas.ExcelFile accepts; only the sheet the
+        # question needs is parsed, and repeated questions against the same file reuse it
+        text_answer, table = answer_question(
+            question,
+            daily=lambda: load_daily_data(cfg, cache_key=digest),
+            monthly=lambda: load_monthly_data(cfg, cache_key=digest),
+            cfg=cfg,
+        )
 
         table_rows = table.to_dict(orient="records") if table is not None else None
 
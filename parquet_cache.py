@@ -0,0 +1,70 @@
+"""Parquet copies of parsed workbook sheets, shared by the trading and weather cases."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+
+def shard_paths(workbook, cache_dir: str, kinds: Iterable[str], layout) -> Optional[Dict[str, Path]]:
+    """
+    Return the Parquet shard path of each kind of frame for a workbook on disk.
+
+    Shards live in cache_dir next to the workbook and are named by the workbook file name
+    and a hash of the workbook bytes and of layout. layout holds whatever else decides the
+    frames: the caller's column mapping and a cache format number that it bumps whenever its
+    normalisation changes what it returns (values, columns or dtypes). So an edited workbook,
+    a different column mapping or a newer normalisation never reuses stale data. Returns None
+    for file-like inputs.
+    """
+    if not isinstance(workbook, (str, os.PathLike)):
+        return None
+    path = Path(workbook)
+    digest = hashlib.sha1(path.read_bytes())
+    digest.update(repr(layout).encode())
+    key = digest.hexdigest()
+    return {kind: path.parent / cache_dir / f"{path.name}.{key}.{kind}.parquet" for kind in kinds}
+
+
+def read_shards(paths: Dict[str, Path]) -> Dict[str, pd.DataFrame]:
+    """Read the shards that exist; missing or unreadable ones are left out for the caller to re-parse."""
+    frames = {}
+    for kind, path in paths.items():
+        if path.exists():
+            try:
+                frames[kind] = pd.read_parquet(path)
+            except (ImportError, OSError, ValueError):
+                pass  # unreadable shard (or no pyarrow); the caller re-parses the sheet
+    return frames
+
+
+def write_shards(frames: Dict[str, pd.DataFrame], paths: Dict[str, Path], **to_parquet_kwargs) -> None:
+    """
+    Write each frame to its shard and remove the shards of earlier versions of the same workbook.
+
+    The cache is best effort: failures (no pyarrow, read-only dir, mixed-type column) are ignored.
+    """
+    try:
+        for kind, df in frames.items():
+            path = paths[kind]
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary name first so a partly written shard is never picked up
+            tmp_path = path.with_suffix(".tmp")
+            df.to_parquet(tmp_path, index=False, **to_parquet_kwargs)
+            os.replace(tmp_path, path)
+            _prune_shards(path)
+    except (ImportError, OSError, TypeError, ValueError):
+        pass
+
+
+def _prune_shards(path: Path) -> None:
+    """Remove the shards of earlier versions of the same workbook, keeping the one at path."""
+    name, key, kind, _ = path.name.rsplit(".", 3)
+    for other in path.parent.glob(f"*.{kind}.parquet"):
+        parts = other.name.rsplit(".", 3)
+        if len(parts) == 4 and parts[0] == name and parts[1] != key:
+            other.unlink(missing_ok=True)
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # optional; mtm_calculator falls back to numpy/numexpr
+    numba = None
+
+
+if numba is not None:
+
+    # No fastmath: the kernel relies on NaN checks, and keeping IEEE semantics makes the
+    # results identical to the numpy fallback.
+    # Not parallel: the threading layer kept the interpreter from exiting when the kernel was
+    # first called off the main thread (Streamlit, TestClient, threadpools).
+    # The on-disk cache records the importing module's name, so only use it under the package
+    # name; scripts run from inside trading_case import this file as plain "_kernels".
+    @numba.njit(cache=__name__ == "trading_case._kernels")
+    def mtm_kernel(
+        base, typical_fe, no_adj, cost, disc, qty, unit_is_wmt, moisture, out_mtm, out_qty, out_ratio
+    ):
+        """
+        Fused MTM arithmetic, one pass over the contract arrays.
+
+        For each contract:
+          - ratio = 1.0 if NoAdj or Typical Fe is missing, else Typical Fe / 62
+          - qty   = Quantity * (1 - Moisture) for WMT (missing Moisture counts as 0), else Quantity
+          - mtm   = (base * ratio + cost) * discount * qty, with missing cost 0 and discount 1
+        """
+        for i in range(base.size):
+            fe = typical_fe[i]
+            ratio = 1.0 if no_adj[i] or np.isnan(fe) else fe / 62.0
+
+            q = qty[i]
+            if unit_is_wmt[i]:
+                m = moisture[i]
+                if np.isnan(m):
+                    m = 0.0
+                q = q * (1.0 - m)
+
+            c = cost[i]
+            if np.isnan(c):
+                c = 0.0
+            d = disc[i]
+            if np.isnan(d):
+                d = 1.0
+
+            out_ratio[i] = ratio
+            out_qty[i] = q
+            out_mtm[i] = (base[i] * ratio + c) * d * q
+
+else:
+    mtm_kernel = None
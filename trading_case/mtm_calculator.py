@@ -1,9 +1,45 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
-
+import sys
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import astuple, dataclass
+from datetime import date
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+import openpyxl
 import pandas as pd
+import xlsxwriter
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
+
+try:
+    import python_calamine
+except ImportError:  # optional fast reader; fall back to openpyxl read-only mode
+    python_calamine = None
+
+try:
+    import numexpr
+except ImportError:  # optional; fall back to plain numpy arithmetic
+    numexpr = None
+
+try:
+    from trading_case._kernels import mtm_kernel
+except ModuleNotFoundError:
+    # Support importing this module from inside the trading_case folder
+    from _kernels import mtm_kernel
+
+try:
+    from parquet_cache import read_shards, shard_paths, write_shards
+except ModuleNotFoundError:
+    # Scripts run from inside trading_case only have that folder on sys.path
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    from parquet_cache import read_shards, shard_paths, write_shards
+
+# Below this many contracts the numpy/numexpr path takes a few milliseconds, less than
+# compiling (or loading the cached) kernel costs on first use
+_KERNEL_MIN_ROWS = 1_000_000
 
 
 @dataclass
@@ -39,18 +75,118 @@ class MTMConfig:
     # Output
     col_report_date: str = "Valuation Date"
 
+    # Parquet copies of the normalised inputs, stored in cache_dir next to the input workbook
+    use_cache: bool = True
+    cache_dir: str = ".cache"
+
+
+def _convert_calamine_cell(value):
+    # Match pandas' calamine reader: blank cells are missing, whole floats are ints,
+    # dates are Timestamps
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, str):
+        return np.nan if value == "" else value
+    if isinstance(value, date):
+        return pd.Timestamp(value)
+    return value
+
+
+def _header_names(header, convert=None) -> list:
+    """
+    Column names for a header row, as pandas' read_excel names them: blank cells become
+    "Unnamed: <position>" and repeated names get ".1", ".2", ... suffixes, given to the
+    named columns first and then to the unnamed ones.
+    """
+    unnamed = [i for i, col in enumerate(header) if col is None or col == ""]
+    names = [col if convert is None else convert(col) for col in header]
+    for i in unnamed:
+        names[i] = f"Unnamed: {i}"
+
+    unnamed_set = set(unnamed)
+    counts: "defaultdict[object, int]" = defaultdict(int)
+    for i in [i for i in range(len(names)) if i not in unnamed_set] + unnamed:
+        col = base = names[i]
+        count = counts[col]
+        while count > 0:
+            counts[base] = count + 1
+            col = f"{base}.{count}"
+            # Skip suffixed names that another header cell already uses
+            count = count + 1 if col in names else counts[col]
+        names[i] = col
+        counts[col] = count + 1
+    return names
+
+
+def _rows_to_frame(rows, cols: Optional[list[str]] = None, convert=None) -> pd.DataFrame:
+    """Build a DataFrame from sheet rows whose first row is the header, keeping only cols if given."""
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame()
+    header = _header_names(header, convert)
+    keep = [i for i, col in enumerate(header) if cols is None or col in cols]
+    if convert is None:
+        data = [[row[i] for i in keep] for row in rows]
+    else:
+        data = [[convert(row[i]) for i in keep] for row in rows]
+    return pd.DataFrame(data, columns=[header[i] for i in keep])
+
+
+def _read_sheets(
+    excel_path, sheet_names: list[str], usecols: Optional[list[Optional[list[str]]]] = None
+) -> list[pd.DataFrame]:
+    """
+    Read the given sheets into DataFrames, using the first row as the header.
+
+    usecols optionally gives, per sheet, the column names to keep (None keeps all).
+    Uses python-calamine when installed, opening the workbook once for all sheets;
+    otherwise streams rows with openpyxl in read-only mode instead of building the
+    full workbook DOM.
+    """
+    usecols = usecols or [None] * len(sheet_names)
+
+    if python_calamine is not None:
+        wb = python_calamine.CalamineWorkbook.from_object(excel_path)
+        try:
+            # Keep leading blank rows/columns so the header is the sheet's first row, as with openpyxl
+            return [
+                _rows_to_frame(
+                    wb.get_sheet_by_name(name).to_python(skip_empty_area=False), cols, convert=_convert_calamine_cell
+                )
+                for name, cols in zip(sheet_names, usecols)
+            ]
+        finally:
+            wb.close()
+
+    wb = openpyxl.load_workbook(excel_path, read_only=True, data_only=True)
+    try:
+        return [
+            _rows_to_frame(wb[name].iter_rows(values_only=True), cols)
+            for name, cols in zip(sheet_names, usecols)
+        ]
+    finally:
+        wb.close()
+
 
 def _normalise_price_df(df: pd.DataFrame, cfg: MTMConfig) -> pd.DataFrame:
-    df = df.copy()
-    df[cfg.col_price_date] = pd.to_datetime(df[cfg.col_price_date])
+    """
+    Normalise the raw Price sheet in place (the input frame is consumed).
+
+    Columns the reader already typed (date cells, numeric cells) are left as they are;
+    only text columns pay for the per-cell conversion.
+    """
+    if not is_datetime64_any_dtype(df[cfg.col_price_date]):
+        df[cfg.col_price_date] = pd.to_datetime(df[cfg.col_price_date], cache=True)
     df[cfg.col_price_index_name] = df[cfg.col_price_index_name].astype(str).str.strip()
     df[cfg.col_price_tenor] = df[cfg.col_price_tenor].astype(str).str.strip()
-    df[cfg.col_price_value] = pd.to_numeric(df[cfg.col_price_value], errors="coerce")
+    if not is_numeric_dtype(df[cfg.col_price_value]):
+        df[cfg.col_price_value] = pd.to_numeric(df[cfg.col_price_value], errors="coerce")
     return df
 
 
 def _normalise_contracts_df(df: pd.DataFrame, cfg: MTMConfig) -> pd.DataFrame:
-    df = df.copy()
+    """Normalise the raw Contracts sheet in place (the input frame is consumed)."""
     df[cfg.col_contract_index_name] = df[cfg.col_contract_index_name].astype(str).str.strip()
     df[cfg.col_contract_tenor] = df[cfg.col_contract_tenor].astype(str).str.strip()
 
@@ -61,52 +197,144 @@ def _normalise_contracts_df(df: pd.DataFrame, cfg: MTMConfig) -> pd.DataFrame:
         cfg.col_contract_quantity,
         cfg.col_contract_moisture,
     ]:
-        if col in df.columns:
+        if col in df.columns and not is_numeric_dtype(df[col]):
             df[col] = pd.to_numeric(df[col], errors="coerce")
 
     if cfg.col_contract_unit in df.columns:
         df[cfg.col_contract_unit] = df[cfg.col_contract_unit].astype(str).str.upper().str.strip()
 
     if cfg.col_contract_fe_adj_flag in df.columns:
-        df[cfg.col_contract_fe_adj_flag] = df[cfg.col_contract_fe_adj_flag].astype(str).str.strip()
+        df[cfg.col_contract_fe_adj_flag] = df[cfg.col_contract_fe_adj_flag].astype(str).str.upper().str.strip()
 
     return df
 
 
-def _lookup_base_price_for_contracts(
-    prices: pd.DataFrame, contracts: pd.DataFrame, valuation_date: pd.Timestamp, cfg: MTMConfig
-) -> pd.Series:
+# (price lookup, normalised contracts) keyed by (content digest, config), least recently used first.
+_INPUT_CACHE_MAXSIZE = 16
+_input_cache: "OrderedDict[tuple, Tuple[PriceLookup, pd.DataFrame]]" = OrderedDict()
+_input_cache_lock = threading.Lock()
+
+
+# Part of the Parquet shard key (see parquet_cache.shard_paths); bump it whenever the
+# normalisation changes what it returns.
+_CACHE_FORMAT = 2
+
+
+def _load_and_normalise(excel_path, cfg: MTMConfig) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    shards = None
+    if cfg.use_cache:
+        shards = shard_paths(excel_path, cfg.cache_dir, ("prices", "contracts"), (_CACHE_FORMAT, astuple(cfg)))
+    if shards is not None:
+        frames = read_shards(shards)
+        if len(frames) == len(shards):
+            return frames["prices"], frames["contracts"]
+
+    # Only four Price columns are used; every Contracts column is carried into the report
+    price_cols = [cfg.col_price_date, cfg.col_price_index_name, cfg.col_price_tenor, cfg.col_price_value]
+    prices_raw, contracts_raw = _read_sheets(
+        excel_path, [cfg.price_sheet, cfg.contracts_sheet], usecols=[price_cols, None]
+    )
+    prices = _normalise_price_df(prices_raw, cfg)
+    contracts = _normalise_contracts_df(contracts_raw, cfg)
+
+    if shards is not None:
+        write_shards({"prices": prices, "contracts": contracts}, shards)
+
+    return prices, contracts
+
+
+def _load_inputs(
+    excel_path, cfg: MTMConfig, cache_key: Optional[bytes] = None
+) -> Tuple["PriceLookup", pd.DataFrame]:
     """
-    For each contract, find the base index price applicable for the given valuation_date.
+    Load the price lookup and normalised Contracts frame, reusing an earlier parse of the same content.
+
+    cache_key is a digest of the workbook bytes (e.g. hashlib.sha1(data).digest()). Without
+    it the workbook is always parsed. Cached inputs are shared and must not be modified.
+    """
+    if cache_key is None:
+        prices, contracts = _load_and_normalise(excel_path, cfg)
+        return PriceLookup(prices, cfg), contracts
+
+    key = (cache_key, astuple(cfg))
+    with _input_cache_lock:
+        cached = _input_cache.get(key)
+        if cached is not None:
+            _input_cache.move_to_end(key)
+            return cached
+
+    prices, contracts = _load_and_normalise(excel_path, cfg)
+    loaded = (PriceLookup(prices, cfg), contracts)
+    with _input_cache_lock:
+        _input_cache[key] = loaded
+        while len(_input_cache) > _INPUT_CACHE_MAXSIZE:
+            _input_cache.popitem(last=False)
+    return loaded
+
+
+class PriceLookup:
+    """
+    Latest price on/before a valuation date for each (Index Name, Tenor), built once per Price sheet.
 
     Assumption:
     - Price sheet has one row per (Date, Index Name, Tenor).
     - For a past tenor, we take the last available price on/ before valuation_date
       for the matching (Index Name, Tenor).
+
+    The sheet is pivoted once into (Index Name, Tenor) x Price Date, so each valuation date
+    is a searchsorted over the sorted dates plus one vectorised reindex of the contract keys.
     """
-    prices = prices.copy()
-    prices = prices[prices[cfg.col_price_date] <= valuation_date]
 
-    # Sort so that groupby().tail(1) gives us the latest available price per (index, tenor)
-    prices = prices.sort_values([cfg.col_price_index_name, cfg.col_price_tenor, cfg.col_price_date])
-    latest_prices = (
-        prices.groupby([cfg.col_price_index_name, cfg.col_price_tenor]).tail(1).set_index(
-            [cfg.col_price_index_name, cfg.col_price_tenor]
+    def __init__(self, prices: pd.DataFrame, cfg: MTMConfig):
+        self.cfg = cfg
+        prices = (
+            prices.loc[prices[cfg.col_price_date].notna()]
+            .sort_values(cfg.col_price_date, kind="stable")
+            .reset_index(drop=True)
         )
-    )
-
-    # Build a MultiIndex from contracts to align with latest_prices index
-    idx = pd.MultiIndex.from_arrays(
-        [
-            contracts[cfg.col_contract_index_name].astype(str).str.strip(),
-            contracts[cfg.col_contract_tenor].astype(str).str.strip(),
-        ],
-        names=[cfg.col_price_index_name, cfg.col_price_tenor],
-    )
-
-    base_prices = latest_prices.reindex(idx)[cfg.col_price_value]
-    base_prices.index = contracts.index  # Align back to contracts index
-    return base_prices
+        self._values = prices[cfg.col_price_value].to_numpy(dtype="float64", na_value=np.nan)
+
+        # Pivot row positions rather than prices so a quoted-but-missing price still counts as
+        # the latest quote; rows are date-sorted, so the last row per cell wins on duplicates
+        last_row = pd.DataFrame(
+            {
+                cfg.col_price_index_name: prices[cfg.col_price_index_name],
+                cfg.col_price_tenor: prices[cfg.col_price_tenor],
+                cfg.col_price_date: prices[cfg.col_price_date],
+                "_row": np.arange(len(prices), dtype="float64"),
+            }
+        ).pivot_table(
+            index=[cfg.col_price_index_name, cfg.col_price_tenor],
+            columns=cfg.col_price_date,
+            values="_row",
+            aggfunc="max",
+        )
+        # Carry each key's last quote forward so every date column holds the latest row on/before it
+        self._latest_row = last_row.ffill(axis=1)
+        self._dates = last_row.columns.to_numpy()
+
+    @property
+    def latest_date(self) -> pd.Timestamp:
+        """Latest price date in the sheet (NaT if there are no dated prices)."""
+        return pd.Timestamp(self._dates[-1]) if len(self._dates) else pd.NaT
+
+    def base_prices(self, contracts: pd.DataFrame, valuation_date: pd.Timestamp) -> pd.Series:
+        """For each contract, the base index price applicable for the given valuation_date."""
+        cfg = self.cfg
+        base = np.full(len(contracts), np.nan)
+
+        pos = np.searchsorted(self._dates, pd.Timestamp(valuation_date).to_datetime64(), side="right") - 1
+        if pos >= 0:
+            # Contract keys are already stripped by _normalise_contracts_df
+            idx = pd.MultiIndex.from_arrays(
+                [contracts[cfg.col_contract_index_name], contracts[cfg.col_contract_tenor]],
+                names=[cfg.col_price_index_name, cfg.col_price_tenor],
+            )
+            rows = self._latest_row.iloc[:, pos].reindex(idx).to_numpy()
+            found = ~np.isnan(rows)
+            base[found] = self._values[rows[found].astype(np.intp)]
+
+        return pd.Series(base, index=contracts.index, name=cfg.col_price_value)
 
 
 def _compute_fe_adjustment_ratio(contracts: pd.DataFrame, cfg: MTMConfig) -> pd.Series:
@@ -118,19 +346,20 @@ def _compute_fe_adjustment_ratio(contracts: pd.DataFrame, cfg: MTMConfig) -> pd.
     flag = contracts.get(cfg.col_contract_fe_adj_flag)
     typical_fe = contracts.get(cfg.col_contract_typical_fe)
 
-    no_adj_mask = flag.astype(str).str.upper().eq("NOADJ") if flag is not None else False
+    # Flag is already upper-cased and stripped by _normalise_contracts_df
+    no_adj_mask = flag.eq("NOADJ") if flag is not None else False
 
-    ratio = pd.Series(1.0, index=contracts.index, dtype="float64")
+    ratio = np.ones(len(contracts), dtype="float64")
 
     if typical_fe is not None:
         # Compute Typical Fe / 62, falling back to 1.0 where data is missing
-        ratio_loc = typical_fe / 62.0
-        ratio = ratio_loc.fillna(1.0)
+        ratio_loc = typical_fe.to_numpy(dtype="float64", na_value=np.nan) / 62.0
+        ratio = np.where(np.isnan(ratio_loc), 1.0, ratio_loc)
 
     if isinstance(no_adj_mask, pd.Series):
-        ratio = ratio.where(~no_adj_mask, 1.0)
+        ratio = np.where(no_adj_mask.to_numpy(), 1.0, ratio)
 
-    return ratio
+    return pd.Series(ratio, index=contracts.index)
 
 
 def _compute_quantity_dmt(contracts: pd.DataFrame, cfg: MTMConfig) -> pd.Series:
@@ -146,26 +375,109 @@ def _compute_quantity_dmt(contracts: pd.DataFrame, cfg: MTMConfig) -> pd.Series:
     if qty is None:
         return pd.Series(dtype="float64", index=contracts.index)
 
-    qty_dmt = pd.to_numeric(qty, errors="coerce")
+    # Quantity and Moisture are already numeric after _normalise_contracts_df
+    qty_dmt = qty
 
     if unit is None:
         return qty_dmt
 
-    unit_upper = unit.astype(str).str.upper().str.strip()
-    wmt_mask = unit_upper.eq("WMT")
+    # Unit is already upper-cased and stripped by _normalise_contracts_df
+    wmt_mask = unit.eq("WMT")
 
     if moisture is not None:
-        m = pd.to_numeric(moisture, errors="coerce").fillna(0.0)
-        wmt_qty = qty_dmt * (1.0 - m)
-        qty_dmt = qty_dmt.where(~wmt_mask, wmt_qty)
+        q = qty_dmt.to_numpy(dtype="float64", na_value=np.nan)
+        m = moisture.to_numpy(dtype="float64", na_value=np.nan)
+        m = np.where(np.isnan(m), 0.0, m)
+        qty_dmt = pd.Series(np.where(wmt_mask.to_numpy(), q * (1.0 - m), q), index=contracts.index)
 
     return qty_dmt
 
 
+def _compute_mtm_value(
+    contracts: pd.DataFrame,
+    base_price_series: pd.Series,
+    fe_adj_ratio: pd.Series,
+    qty_dmt: pd.Series,
+    cfg: MTMConfig,
+) -> pd.Series:
+    """MTM Value = (Base Index Price x Fe Adjustment Ratio + Cost) x Discount x Quantity(DMT)"""
+    # Only build the all-default Series when the column is actually missing; the columns are
+    # already numeric after _normalise_contracts_df
+    if cfg.col_contract_cost in contracts.columns:
+        cost = contracts[cfg.col_contract_cost].fillna(0.0)
+    else:
+        cost = pd.Series(0.0, index=contracts.index)
+    if cfg.col_contract_discount in contracts.columns:
+        discount = contracts[cfg.col_contract_discount].fillna(1.0)
+    else:
+        discount = pd.Series(1.0, index=contracts.index)
+
+    operands = {
+        name: series.to_numpy(dtype="float64", na_value=np.nan)
+        for name, series in (
+            ("b", base_price_series),
+            ("r", fe_adj_ratio),
+            ("c", cost),
+            ("d", discount),
+            ("q", qty_dmt),
+        )
+    }
+    if numexpr is not None:
+        # One blocked pass over the inputs instead of a temporary array per operation
+        mtm_values = numexpr.evaluate("(b * r + c) * d * q", local_dict=operands)
+    else:
+        b, r, c, d, q = (operands[name] for name in "brcdq")
+        mtm_values = (b * r + c) * d * q
+    return pd.Series(mtm_values, index=contracts.index)
+
+
+def _float_column(contracts: pd.DataFrame, col: str, default: float) -> np.ndarray:
+    if col in contracts.columns:
+        return contracts[col].to_numpy(dtype="float64", na_value=np.nan)
+    return np.full(len(contracts), default)
+
+
+def _flag_column(contracts: pd.DataFrame, col: str, value: str) -> np.ndarray:
+    if col in contracts.columns:
+        return contracts[col].eq(value).to_numpy(dtype=bool, na_value=False)
+    return np.zeros(len(contracts), dtype=bool)
+
+
+def _compute_mtm_columns_numba(
+    contracts: pd.DataFrame, base_price_series: pd.Series, cfg: MTMConfig
+) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    """
+    Fe Adjustment Ratio, Quantity (DMT) and MTM Value in one fused numba pass.
+
+    Same rules as _compute_fe_adjustment_ratio, _compute_quantity_dmt and _compute_mtm_value.
+    """
+    n = len(contracts)
+    out_mtm, out_qty, out_ratio = np.empty(n), np.empty(n), np.empty(n)
+    mtm_kernel(
+        base_price_series.to_numpy(dtype="float64", na_value=np.nan),
+        _float_column(contracts, cfg.col_contract_typical_fe, np.nan),
+        _flag_column(contracts, cfg.col_contract_fe_adj_flag, "NOADJ"),
+        _float_column(contracts, cfg.col_contract_cost, 0.0),
+        _float_column(contracts, cfg.col_contract_discount, 1.0),
+        _float_column(contracts, cfg.col_contract_quantity, np.nan),
+        _flag_column(contracts, cfg.col_contract_unit, "WMT"),
+        _float_column(contracts, cfg.col_contract_moisture, 0.0),
+        out_mtm,
+        out_qty,
+        out_ratio,
+    )
+    return (
+        pd.Series(out_ratio, index=contracts.index),
+        pd.Series(out_qty, index=contracts.index),
+        pd.Series(out_mtm, index=contracts.index),
+    )
+
+
 def compute_mtm_for_date(
     excel_path: str,
     valuation_date: Optional[str | pd.Timestamp] = None,
     cfg: Optional[MTMConfig] = None,
+    cache_key: Optional[bytes] = None,
 ) -> pd.DataFrame:
     """
     Compute MTM valuation for all contracts for a given valuation_date.
@@ -178,6 +490,10 @@ def compute_mtm_for_date(
         Date for which to compute MTM. If None, use the latest price date in the Price sheet.
     cfg : MTMConfig, optional
         Configuration of sheet and column names.
+    cache_key : bytes, optional
+        Digest of the workbook content. When given, the parsed inputs and price lookup
+        are cached under this key, so repeated calls on the same content (e.g. for several
+        valuation dates) skip parsing and reuse the lookup.
 
     Returns
     -------
@@ -187,29 +503,19 @@ def compute_mtm_for_date(
     cfg = cfg or MTMConfig()
 
     # Load data
-    xls = pd.ExcelFile(excel_path)
-    prices_raw = pd.read_excel(xls, sheet_name=cfg.price_sheet)
-    contracts_raw = pd.read_excel(xls, sheet_name=cfg.contracts_sheet)
-
-    prices = _normalise_price_df(prices_raw, cfg)
-    contracts = _normalise_contracts_df(contracts_raw, cfg)
+    price_lookup, contracts = _load_inputs(excel_path, cfg, cache_key)
 
     if valuation_date is None:
-        valuation_date = prices[cfg.col_price_date].max()
+        valuation_date = price_lookup.latest_date
     valuation_date = pd.to_datetime(valuation_date)
 
-    base_price_series = _lookup_base_price_for_contracts(prices, contracts, valuation_date, cfg)
-    fe_adj_ratio = _compute_fe_adjustment_ratio(contracts, cfg)
-    qty_dmt = _compute_quantity_dmt(contracts, cfg)
-
-    cost = contracts.get(cfg.col_contract_cost, pd.Series(0.0, index=contracts.index))
-    discount = contracts.get(cfg.col_contract_discount, pd.Series(1.0, index=contracts.index))
-
-    cost = pd.to_numeric(cost, errors="coerce").fillna(0.0)
-    discount = pd.to_numeric(discount, errors="coerce").fillna(1.0)
-
-    # MTM Value = (Base Index Price x Fe Adjustment Ratio + Cost) x Discount x Quantity(DMT)
-    mtm_value = (base_price_series * fe_adj_ratio + cost) * discount * qty_dmt
+    base_price_series = price_lookup.base_prices(contracts, valuation_date)
+    if mtm_kernel is not None and len(contracts) >= _KERNEL_MIN_ROWS:
+        fe_adj_ratio, qty_dmt, mtm_value = _compute_mtm_columns_numba(contracts, base_price_series, cfg)
+    else:
+        fe_adj_ratio = _compute_fe_adjustment_ratio(contracts, cfg)
+        qty_dmt = _compute_quantity_dmt(contracts, cfg)
+        mtm_value = _compute_mtm_value(contracts, base_price_series, fe_adj_ratio, qty_dmt, cfg)
 
     result = contracts.copy()
     result["Base Index Price"] = base_price_series
@@ -221,11 +527,46 @@ def compute_mtm_for_date(
     return result
 
 
+# Rows converted to Python values at a time by write_mtm_report
+_REPORT_CHUNK_ROWS = 10_000
+
+
+def write_mtm_report(mtm_df: pd.DataFrame, output, sheet_name: str = "MTM Report") -> None:
+    """
+    Write an MTM report to Excel with xlsxwriter in constant_memory mode.
+
+    Rows are written in order and flushed as they go, so memory stays flat for large
+    reports (pandas' to_excel writes column by column, which constant_memory cannot handle).
+    Cells are converted to Python values one chunk of rows at a time for the same reason.
+    output may be a path or a writable binary file-like object.
+    """
+    workbook = xlsxwriter.Workbook(
+        output,
+        {
+            "constant_memory": True,
+            "default_date_format": "yyyy-mm-dd hh:mm:ss",
+            "nan_inf_to_errors": True,
+        },
+    )
+    try:
+        worksheet = workbook.add_worksheet(sheet_name)
+        worksheet.write_row(0, 0, [str(col) for col in mtm_df.columns], workbook.add_format({"bold": True}))
+        for start in range(0, len(mtm_df), _REPORT_CHUNK_ROWS):
+            chunk = mtm_df.iloc[start : start + _REPORT_CHUNK_ROWS]
+            values = chunk.astype(object).where(chunk.notna(), None)
+            for row_num, row in enumerate(values.itertuples(index=False, name=None), start=start + 1):
+                worksheet.write_row(row_num, 0, row)
+    finally:
+        workbook.close()
+
+
 def generate_daily_mtm_report(
     excel_path: str,
     output_path: str,
     valuation_date: Optional[str | pd.Timestamp] = None,
     cfg: Optional[MTMConfig] = None,
+    cache_key: Optional[bytes] = None,
+    write_report: bool = True,
 ) -> pd.DataFrame:
     """
     High-level helper to compute MTM and write a daily report to Excel.
@@ -240,8 +581,15 @@ def generate_daily_mtm_report(
         Valuation date. If None, uses latest price date.
     cfg : MTMConfig, optional
         Configuration of sheet/column names.
+    cache_key : bytes, optional
+        Digest of the workbook content, passed through to compute_mtm_for_date.
+    write_report : bool, default True
+        If False, skip writing output_path and only return the MTM DataFrame.
     """
     cfg = cfg or MTMConfig()
-    mtm_df = compute_mtm_for_date(excel_path=excel_path, valuation_date=valuation_date, cfg=cfg)
-    mtm_df.to_excel(output_path, index=False, sheet_name="MTM Report")
+    mtm_df = compute_mtm_for_date(
+        excel_path=excel_path, valuation_date=valuation_date, cfg=cfg, cache_key=cache_key
+    )
+    if write_report:
+        write_mtm_report(mtm_df, output_path)
     return mtm_df
@@ -0,0 +1,101 @@
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+
+from trading_case import mtm_calculator
+from trading_case.mtm_calculator import MTMConfig, PriceLookup, _header_names, _read_sheets
+
+
+CFG = MTMConfig()
+
+
+def _prices(rows):
+    return pd.DataFrame(
+        rows, columns=[CFG.col_price_date, CFG.col_price_index_name, CFG.col_price_tenor, CFG.col_price_value]
+    ).astype({CFG.col_price_date: "datetime64[ns]", CFG.col_price_value: "float64"})
+
+
+def _contracts(keys):
+    return pd.DataFrame(keys, columns=[CFG.col_contract_index_name, CFG.col_contract_tenor])
+
+
+@pytest.fixture
+def lookup():
+    # Deliberately not in date order; ("IDX", "T1") has a quote without a price on 2025-07-04
+    return PriceLookup(
+        _prices(
+            [
+                ("2025-07-03", "IDX", "T1", 110.0),
+                ("2025-07-01", "IDX", "T1", 100.0),
+                ("2025-07-02", "IDX", "T2", 50.0),
+                ("2025-07-04", "IDX", "T1", None),
+                ("2025-07-02", "IDX", "T2", 55.0),
+            ]
+        ),
+        CFG,
+    )
+
+
+@pytest.mark.parametrize(
+    "valuation_date, expected",
+    [
+        ("2025-06-30", [np.nan, np.nan, np.nan]),
+        ("2025-07-01", [100.0, np.nan, np.nan]),
+        ("2025-07-02", [100.0, 55.0, np.nan]),
+        ("2025-07-03 12:00", [110.0, 55.0, np.nan]),
+        ("2025-07-04", [np.nan, 55.0, np.nan]),
+        ("2026-01-01", [np.nan, 55.0, np.nan]),
+    ],
+)
+def test_price_lookup_uses_latest_quote_on_or_before_the_date(lookup, valuation_date, expected):
+    contracts = _contracts([("IDX", "T1"), ("IDX", "T2"), ("OTHER", "T1")])
+
+    base = lookup.base_prices(contracts, pd.Timestamp(valuation_date))
+
+    np.testing.assert_array_equal(base.to_numpy(), expected)
+    assert base.index.equals(contracts.index)
+
+
+def test_price_lookup_latest_date(lookup):
+    assert lookup.latest_date == pd.Timestamp("2025-07-04")
+    assert PriceLookup(_prices([]), CFG).latest_date is pd.NaT
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        (["A", None, "", "B"], ["A", "Unnamed: 1", "Unnamed: 2", "B"]),
+        (["Quantity", "Quantity", "Quantity.1"], ["Quantity", "Quantity.2", "Quantity.1"]),
+        (["x.1", "x", "x"], ["x.1", "x", "x.2"]),
+        # Named columns are deduplicated before the unnamed ones
+        ([None, "Unnamed: 0"], ["Unnamed: 0.1", "Unnamed: 0"]),
+        (["a", "a", None, "a.1", None], ["a", "a.2", "Unnamed: 2", "a.1", "Unnamed: 4"]),
+    ],
+)
+def test_header_names_match_read_excel(header, expected):
+    assert _header_names(header) == expected
+
+
+@pytest.mark.parametrize("use_calamine", [True, False])
+@pytest.mark.parametrize("first_row, first_col", [(1, 1), (2, 1), (1, 2)])
+def test_read_sheets_matches_read_excel(tmp_path, monkeypatch, use_calamine, first_row, first_col):
+    if not use_calamine:
+        monkeypatch.setattr(mtm_calculator, "python_calamine", None)
+    elif mtm_calculator.python_calamine is None:
+        pytest.skip("python-calamine is not installed")
+    path = tmp_path / "sheet.xlsx"
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "S"
+    for i, row in enumerate([["A", "B", None, "A"], [1, "x", 2.5, 3], [4, "y", None, 5]]):
+        for j, value in enumerate(row):
+            if value is not None:
+                ws.cell(first_row + i, first_col + j, value)
+    wb.save(path)
+
+    (got,) = _read_sheets(path, ["S"])
+
+    expected = pd.read_excel(path, sheet_name="S", engine="calamine" if use_calamine else "openpyxl")
+    assert list(got.columns) == list(expected.columns)
+    assert got.shape == expected.shape
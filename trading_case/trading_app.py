@@ -3,25 +3,16 @@ from datetime import date
 from pathlib import Path
 import sys
 
-import pandas as pd
 import streamlit as st
 
 # MUST be the first Streamlit command in the file
 st.set_page_config(page_title="Trading MTM Valuation Assistant", layout="wide")
 
 try:
-    from trading_case.mtm_calculator import generate_daily_mtm_report
+    from trading_case.mtm_calculator import generate_daily_mtm_report, write_mtm_report
 except ModuleNotFoundError:
     # Support running from the package directory or as a module
-    from mtm_calculator import generate_daily_mtm_report
-
-
-def _save_uploaded_file(uploaded_file) -> Path:
-    """Save uploaded Excel to a temporary path under the current directory."""
-    data = uploaded_file.read()
-    path = Path(f"uploaded_{uploaded_file.name}")
-    path.write_bytes(data)
-    return path
+    from mtm_calculator import generate_daily_mtm_report, write_mtm_report
 
 
 def app() -> None:
@@ -58,7 +49,8 @@ def app() -> None:
                 if uploaded is None:
                     st.error("Please upload an Excel file or tick the checkbox to use the default file.")
                     st.stop()
-                excel_path = _save_uploaded_file(uploaded)
+                # Read the upload straight from memory rather than via a file on disk
+                excel_path = io.BytesIO(uploaded.getvalue())
 
             valuation_date_str = None
             if isinstance(val_date, date):
@@ -67,22 +59,22 @@ def app() -> None:
             with st.spinner("Calculating MTM valuation..."):
                 output_path = Path("MTM_valuation_report_streamlit.xlsx")
                 mtm_df = generate_daily_mtm_report(
-                    excel_path=str(excel_path),
+                    excel_path=excel_path,
                     output_path=str(output_path),
                     valuation_date=valuation_date_str,
+                    write_report=False,
                 )
+                # Serialise the report once: the same bytes are saved and offered for download
+                buf = io.BytesIO()
+                write_mtm_report(mtm_df, buf)
+                output_path.write_bytes(buf.getvalue())
+                buf.seek(0)
 
             st.success(f"MTM report generated ({len(mtm_df)} rows).")
 
             st.subheader("MTM report preview")
             st.dataframe(mtm_df.head(50))
 
-            # Prepare download
-            buf = io.BytesIO()
-            with pd.ExcelWriter(buf, engine="openpyxl") as writer:
-                mtm_df.to_excel(writer, sheet_name="MTM Report", index=False)
-            buf.seek(0)
-
             st.download_button(
                 "Download full MTM report as Excel",
                 data=buf,
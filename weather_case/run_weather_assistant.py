@@ -1,6 +1,6 @@
 import argparse
 
-from weather_analysis import WeatherConfig, load_weather_data, answer_question
+from weather_analysis import WeatherConfig, answer_question, load_daily_data, load_monthly_data
 
 
 def main() -> None:
@@ -32,14 +32,16 @@ def main() -> None:
     args = parser.parse_args()
 
     cfg = WeatherConfig(excel_path=args.excel)
-    daily_df, monthly_df = load_weather_data(cfg)
 
     if args.question:
         question = args.question
     else:
         question = input("Enter your precipitation question:\n> ")
 
-    text_answer, table = answer_question(question, daily=daily_df, monthly=monthly_df, cfg=cfg)
+    # Only the sheet the question needs is loaded
+    text_answer, table = answer_question(
+        question, daily=lambda: load_daily_data(cfg), monthly=lambda: load_monthly_data(cfg), cfg=cfg
+    )
 
     print("\nAnswer:")
     print(text_answer)
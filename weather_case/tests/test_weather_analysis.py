@@ -0,0 +1,140 @@
+import datetime as dt
+
+import pandas as pd
+import pytest
+
+from weather_case.weather_analysis import (
+    WeatherConfig,
+    _week_bounds,
+    answer_question,
+    load_weather_data,
+    query_monthly_precip_by_district,
+    query_weekly_precip_by_state,
+    query_weekly_precip_by_states,
+)
+
+
+DAILY_COLUMNS = ["Date", "State", "District", "Daily Precipitation"]
+MONTHLY_COLUMNS = ["Year", "Month", "State", "District", "Monthly Precipitation"]
+
+
+def _load(tmp_path, daily_rows, monthly_rows):
+    """Write a Daily/Monthly workbook and load it without the Parquet cache."""
+    path = tmp_path / "weather.xlsx"
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame(daily_rows, columns=DAILY_COLUMNS).to_excel(writer, sheet_name="Daily", index=False)
+        pd.DataFrame(monthly_rows, columns=MONTHLY_COLUMNS).to_excel(writer, sheet_name="Monthly", index=False)
+    cfg = WeatherConfig(excel_path=str(path), use_cache=False)
+    daily, monthly = load_weather_data(cfg)
+    return cfg, daily, monthly
+
+
+@pytest.fixture
+def blank_district_tables(tmp_path):
+    daily = [[dt.datetime(2001, 8, 1), "Maharashtra", "Pune", 1.0]]
+    monthly = [
+        [2001, 8, "Maharashtra", "Pune", 10.0],
+        [2001, 9, "Maharashtra", None, 99.0],
+        [2002, 8, "Maharashtra", "Pune", 20.0],
+        [2001, 8, "Uttar Pradesh", None, 50.0],
+    ]
+    return _load(tmp_path, daily, monthly)
+
+
+def test_monthly_query_with_blank_district_cells(blank_district_tables):
+    cfg, daily, monthly = blank_district_tables
+
+    answer, table = answer_question(
+        "What is the total precipitation amount of district Pune in each August from year 2001 to 2005?",
+        daily=daily,
+        monthly=monthly,
+        cfg=cfg,
+    )
+
+    assert "30.00" in answer
+    assert table["Monthly Precipitation"].tolist() == [10.0, 20.0]
+
+
+def test_blank_district_name_matches_no_rows(blank_district_tables):
+    cfg, daily, monthly = blank_district_tables
+
+    assert query_monthly_precip_by_district(monthly, cfg, "  ").empty
+    answer, table = answer_question(
+        "total precipitation of district   in each august from year 2001 to 2005", daily=daily, monthly=monthly
+    )
+    assert answer.startswith("No monthly precipitation data found")
+
+
+@pytest.fixture
+def weekly_tables(tmp_path):
+    daily = [
+        [dt.datetime(2024, 12, 28), "Kerala", "Kochi", 1.0],  # week 52
+        [dt.datetime(2025, 1, 2), "Kerala", "Kochi", 2.0],  # week 1
+        [dt.datetime(2025, 1, 6), "Goa", "Panaji", 6.0],  # week 2
+        [dt.datetime(2025, 1, 1), " kerala ", "Kollam", 3.0],
+        [dt.datetime(2025, 1, 2), "Goa", "Panaji", 4.0],
+        [dt.datetime(2025, 1, 3), None, "Kochi", 5.0],
+        [None, "Goa", "Panaji", 7.0],
+    ]
+    monthly = [[2025, 1, "Goa", "Panaji", 1.0]]
+    return _load(tmp_path, daily, monthly)
+
+
+@pytest.mark.parametrize(
+    "iso_year, iso_week",
+    [(2024, 52), (2025, 1), (2025, 2), (2025, 3), (2023, 1), (0, 0), (-1, 1), (40000, 1), (2025, 300)],
+)
+def test_week_bounds_slice_the_week(weekly_tables, iso_year, iso_week):
+    _, daily, _ = weekly_tables
+
+    lo, hi = _week_bounds(daily, iso_year, iso_week)
+
+    expected = daily[(daily["Year"] == iso_year) & (daily["ISO_Week"] == iso_week)]
+    assert daily.iloc[lo:hi].equals(expected)
+
+
+def test_weekly_queries_match_states_case_insensitively(weekly_tables):
+    cfg, daily, _ = weekly_tables
+
+    result = query_weekly_precip_by_state(daily, cfg, "KERALA", 2025, 1)
+    assert result.to_dict("records") == [
+        {"State": "Kerala", "Year": 2025, "ISO_Week": 1, "Total Weekly Precipitation": 5.0}
+    ]
+
+    totals = query_weekly_precip_by_states(daily, cfg, ["Kerala", "goa", "Assam"], 2025, 1)
+    assert totals.to_dict() == {"kerala": 5.0, "goa": 4.0}
+
+
+def test_blank_state_name_matches_no_rows(weekly_tables):
+    cfg, daily, _ = weekly_tables
+
+    assert query_weekly_precip_by_state(daily, cfg, "", 2025, 1).empty
+    assert query_weekly_precip_by_states(daily, cfg, [" ", "Goa"], 2025, 1).to_dict() == {"goa": 4.0}
+
+
+@pytest.mark.parametrize(
+    "months, start_year, end_year",
+    [(None, None, None), ([8], None, None), ([8, 9], 2002, None), (None, None, 2002), ([9], 2002, 2003), (None, 2004, 2009)],
+)
+def test_monthly_query_slices_years_and_months(tmp_path, months, start_year, end_year):
+    rows = [
+        [year, month, "Maharashtra", district, float(year * 100 + month)]
+        for district in ("Pune", "Mumbai")
+        for year in (2003, 2001, 2002)
+        for month in (9, 8)
+    ]
+    rows += [[None, 8, "Maharashtra", "Pune", 1.0], [2002, None, "Maharashtra", "Pune", 2.0]]
+    cfg, _, monthly = _load(tmp_path, [[dt.datetime(2001, 8, 1), "Maharashtra", "Pune", 1.0]], rows)
+
+    result = query_monthly_precip_by_district(monthly, cfg, "pune", months, start_year, end_year)
+
+    expected = monthly.reset_index(drop=True)
+    expected = expected[expected["District"] == "Pune"]
+    if months is not None:
+        expected = expected[expected["Month"].isin(months)]
+    if start_year is not None:
+        expected = expected[expected["Year"] >= start_year]
+    if end_year is not None:
+        expected = expected[expected["Year"] <= end_year]
+    expected = expected.sort_values(["Year", "Month"], na_position="last")
+    pd.testing.assert_frame_equal(result, expected.reset_index(drop=True), check_index_type=False)
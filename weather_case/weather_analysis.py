@@ -1,9 +1,28 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional, Tuple, Dict, Any, Literal
-
+import re
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import IO, Callable, Optional, Tuple, Dict, Any, Literal, Union
+
+import numpy as np
 import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
+
+try:
+    import python_calamine
+except ImportError:  # optional fast reader; fall back to openpyxl
+    python_calamine = None
+
+try:
+    from parquet_cache import read_shards, shard_paths, write_shards
+except ModuleNotFoundError:
+    # Scripts run from inside weather_case only have that folder on sys.path
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+    from parquet_cache import read_shards, shard_paths, write_shards
 
 
 @dataclass
@@ -14,7 +33,8 @@ class WeatherConfig:
     Adjust these if your actual column names differ.
     """
 
-    excel_path: str = "Weather Data Example.xlsx"
+    # A path, or a binary file-like object such as io.BytesIO for uploaded content
+    excel_path: Union[str, IO[bytes]] = "Weather Data Example.xlsx"
 
     # Sheet names
     daily_sheet: str = "Daily"
@@ -33,33 +53,229 @@ class WeatherConfig:
     col_monthly_district: str = "District"
     col_monthly_precip: str = "Monthly Precipitation"
 
+    # Parquet copies of the normalised tables, stored in cache_dir next to the workbook
+    use_cache: bool = True
+    cache_dir: str = ".cache"
+
+
+# Normalised frames keyed by (content digest, sheet, config), least recently used first.
+_DATA_CACHE_MAXSIZE = 16
+_data_cache: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+_data_cache_lock = threading.Lock()
+
+_SHEETS = ("daily", "monthly")
+
 
-def load_weather_data(cfg: WeatherConfig) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    """Load and normalise daily and monthly precipitation tables."""
-    xls = pd.ExcelFile(cfg.excel_path)
-    daily = pd.read_excel(xls, sheet_name=cfg.daily_sheet)
-    monthly = pd.read_excel(xls, sheet_name=cfg.monthly_sheet)
-
-    # Normalise daily
-    daily = daily.copy()
-    daily[cfg.col_daily_date] = pd.to_datetime(daily[cfg.col_daily_date])
-    daily[cfg.col_daily_state] = daily[cfg.col_daily_state].astype(str).str.strip()
-    daily[cfg.col_daily_district] = daily[cfg.col_daily_district].astype(str).str.strip()
-    daily[cfg.col_daily_precip] = pd.to_numeric(daily[cfg.col_daily_precip], errors="coerce").fillna(0.0)
-
-    # Normalise monthly
-    monthly = monthly.copy()
-    monthly[cfg.col_monthly_year] = pd.to_numeric(monthly[cfg.col_monthly_year], errors="coerce").astype("Int64")
-    monthly[cfg.col_monthly_month] = pd.to_numeric(monthly[cfg.col_monthly_month], errors="coerce").astype("Int64")
-    monthly[cfg.col_monthly_state] = monthly[cfg.col_monthly_state].astype(str).str.strip()
-    monthly[cfg.col_monthly_district] = monthly[cfg.col_monthly_district].astype(str).str.strip()
-    monthly[cfg.col_monthly_precip] = pd.to_numeric(
-        monthly[cfg.col_monthly_precip], errors="coerce"
-    ).fillna(0.0)
+def load_weather_data(
+    cfg: WeatherConfig, cache_key: Optional[bytes] = None
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Load and normalise daily and monthly precipitation tables.
+
+    cache_key is a digest of the workbook bytes (e.g. hashlib.sha1(data).digest()). When
+    given, the result is cached under it so repeated calls on the same content skip
+    parsing. Cached frames are shared and must not be modified.
 
+    daily is indexed by casefolded state name and monthly by (casefolded district, year,
+    month); the query functions below rely on these indexes. Use load_daily_data or
+    load_monthly_data when only one of the tables is needed.
+    """
+    daily, monthly = _load_sheets(cfg, _SHEETS, cache_key)
     return daily, monthly
 
 
+def load_daily_data(cfg: WeatherConfig, cache_key: Optional[bytes] = None) -> pd.DataFrame:
+    """Load only the daily table; see load_weather_data."""
+    return _load_sheets(cfg, ("daily",), cache_key)[0]
+
+
+def load_monthly_data(cfg: WeatherConfig, cache_key: Optional[bytes] = None) -> pd.DataFrame:
+    """Load only the monthly table; see load_weather_data."""
+    return _load_sheets(cfg, ("monthly",), cache_key)[0]
+
+
+def _load_sheets(cfg: WeatherConfig, sheets: Tuple[str, ...], cache_key: Optional[bytes]) -> list[pd.DataFrame]:
+    if cache_key is None:
+        return _load_weather_data(cfg, sheets)
+
+    # excel_path is left out: the digest already identifies the content
+    settings = tuple(getattr(cfg, f.name) for f in fields(cfg) if f.name != "excel_path")
+    keys = {sheet: (cache_key, sheet) + settings for sheet in sheets}
+    found = {}
+    with _data_cache_lock:
+        for sheet, key in keys.items():
+            cached = _data_cache.get(key)
+            if cached is not None:
+                _data_cache.move_to_end(key)
+                found[sheet] = cached
+
+    missing = tuple(sheet for sheet in sheets if sheet not in found)
+    if missing:
+        loaded = _load_weather_data(cfg, missing)
+        with _data_cache_lock:
+            for sheet, df in zip(missing, loaded):
+                _data_cache[keys[sheet]] = df
+                found[sheet] = df
+            while len(_data_cache) > _DATA_CACHE_MAXSIZE:
+                _data_cache.popitem(last=False)
+    return [found[sheet] for sheet in sheets]
+
+
+# Part of the Parquet shard key (see parquet_cache.shard_paths); bump it whenever the
+# sheet parsers change the shape or dtypes of what they return.
+_CACHE_FORMAT = 4
+
+
+def _load_weather_data(cfg: WeatherConfig, sheets: Tuple[str, ...]) -> list[pd.DataFrame]:
+    indexers = {"daily": _index_daily, "monthly": _index_monthly}
+    frames = _load_normalised(cfg, sheets)
+    return [indexers[sheet](df, cfg) for sheet, df in zip(sheets, frames)]
+
+
+def _load_normalised(cfg: WeatherConfig, sheets: Tuple[str, ...]) -> list[pd.DataFrame]:
+    shards = None
+    if cfg.use_cache:
+        layout = [getattr(cfg, f.name) for f in fields(cfg) if f.name.endswith("_sheet") or f.name.startswith("col_")]
+        shards = shard_paths(cfg.excel_path, cfg.cache_dir, sheets, (_CACHE_FORMAT, layout))
+    frames = read_shards(shards) if shards is not None else {}
+
+    missing = tuple(sheet for sheet in sheets if sheet not in frames)
+    if missing:
+        frames.update(zip(missing, _parse_workbook(cfg, missing)))
+        if shards is not None:
+            write_shards({sheet: frames[sheet] for sheet in missing}, shards, compression="zstd")
+
+    return [frames[sheet] for sheet in sheets]
+
+
+def _parse_workbook(cfg: WeatherConfig, sheets: Tuple[str, ...]) -> list[pd.DataFrame]:
+    """
+    Parse and normalise the given sheets ("daily", "monthly") of the workbook.
+
+    Only the configured columns are read. Text columns are typed by the reader via dtype=
+    and dates via parse_dates=; the numeric columns are only coerced when the reader could
+    not type them already (text cells).
+    """
+    if hasattr(cfg.excel_path, "seek"):
+        cfg.excel_path.seek(0)  # a file-like input may have been read before
+    # pandas opens openpyxl workbooks read-only, so the fallback also streams rows
+    engine = "calamine" if python_calamine is not None else "openpyxl"
+    xls = pd.ExcelFile(cfg.excel_path, engine=engine)
+    parsers = {"daily": _parse_daily_sheet, "monthly": _parse_monthly_sheet}
+    return [parsers[sheet](xls, cfg) for sheet in sheets]
+
+
+# State/District are read as Arrow strings (contiguous buffers rather than one Python object
+# per cell on pandas 2.x) and then turned into categoricals; see _stripped_categorical.
+_NAME_READ_DTYPE = "string[pyarrow]"
+
+
+def _parse_daily_sheet(xls: pd.ExcelFile, cfg: WeatherConfig) -> pd.DataFrame:
+    daily = pd.read_excel(
+        xls,
+        sheet_name=cfg.daily_sheet,
+        usecols=[cfg.col_daily_date, cfg.col_daily_state, cfg.col_daily_district, cfg.col_daily_precip],
+        dtype={cfg.col_daily_state: _NAME_READ_DTYPE, cfg.col_daily_district: _NAME_READ_DTYPE},
+        parse_dates=[cfg.col_daily_date],
+    )
+
+    if not is_datetime64_any_dtype(daily[cfg.col_daily_date]):
+        daily[cfg.col_daily_date] = pd.to_datetime(daily[cfg.col_daily_date])
+    daily[cfg.col_daily_state] = _stripped_categorical(daily[cfg.col_daily_state])
+    daily[cfg.col_daily_district] = _stripped_categorical(daily[cfg.col_daily_district])
+    daily[cfg.col_daily_precip] = _coerce_numeric(daily[cfg.col_daily_precip]).fillna(0.0)
+
+    # Calendar fields for the weekly queries, computed once; rows without a date get 0
+    dates = daily[cfg.col_daily_date]
+    daily["Year"] = dates.dt.year.fillna(0).astype(np.int16)
+    daily["ISO_Week"] = dates.dt.isocalendar().week.fillna(0).astype(np.int8)
+    daily["Month"] = dates.dt.month.fillna(0).astype(np.int8)
+    return daily
+
+
+def _parse_monthly_sheet(xls: pd.ExcelFile, cfg: WeatherConfig) -> pd.DataFrame:
+    monthly = pd.read_excel(
+        xls,
+        sheet_name=cfg.monthly_sheet,
+        usecols=[
+            cfg.col_monthly_year,
+            cfg.col_monthly_month,
+            cfg.col_monthly_state,
+            cfg.col_monthly_district,
+            cfg.col_monthly_precip,
+        ],
+        dtype={cfg.col_monthly_state: _NAME_READ_DTYPE, cfg.col_monthly_district: _NAME_READ_DTYPE},
+    )
+
+    monthly[cfg.col_monthly_year] = _coerce_numeric(monthly[cfg.col_monthly_year]).astype("Int64")
+    monthly[cfg.col_monthly_month] = _coerce_numeric(monthly[cfg.col_monthly_month]).astype("Int64")
+    monthly[cfg.col_monthly_state] = _stripped_categorical(monthly[cfg.col_monthly_state])
+    monthly[cfg.col_monthly_district] = _stripped_categorical(monthly[cfg.col_monthly_district])
+    monthly[cfg.col_monthly_precip] = _coerce_numeric(monthly[cfg.col_monthly_precip]).fillna(0.0)
+    return monthly
+
+
+def _stripped_categorical(values: pd.Series) -> pd.Series:
+    """
+    Convert a text column to category dtype with surrounding whitespace removed.
+
+    Only the distinct values are stripped, not every row; categories that become equal
+    (e.g. "Pune" and "Pune ") are merged. The categories use the default str dtype, the
+    same as the Parquet shards give back.
+    """
+    values = values.astype("category")
+    remap, categories = pd.factorize(values.cat.categories.str.strip().astype(str), sort=True)
+    codes = np.append(remap, -1)[values.cat.codes.to_numpy()]  # -1 (missing) stays -1
+    return pd.Series(pd.Categorical.from_codes(codes, categories=categories), index=values.index, name=values.name)
+
+
+def _name_keys(values: pd.Series) -> pd.Categorical:
+    """
+    Casefolded lookup keys for a categorical name column.
+
+    Only the categories are casefolded, so this happens once per distinct name at load time
+    rather than per row and query. Missing names get the key "" so every row has a code;
+    the queries treat a blank name as unknown, so they never match these rows.
+    """
+    categories = values.cat.categories.str.casefold().append(pd.Index([""]))
+    remap, keys = pd.factorize(categories)
+    codes = values.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, codes, len(categories) - 1)
+    return pd.Categorical.from_codes(remap[codes], categories=keys)
+
+
+def _index_daily(daily: pd.DataFrame, cfg: WeatherConfig) -> pd.DataFrame:
+    """
+    Index the daily table by casefolded state name and sort it by (Year, ISO_Week), so a
+    week is a binary-search slice (see _week_bounds). The sort is stable, so rows keep their
+    order within a week. The State column keeps its spelling.
+    """
+    daily = daily.set_index(pd.CategoricalIndex(_name_keys(daily[cfg.col_daily_state]), name="state_key"))
+    return daily.sort_values(["Year", "ISO_Week"], kind="stable")
+
+
+def _index_monthly(monthly: pd.DataFrame, cfg: WeatherConfig) -> pd.DataFrame:
+    """
+    Index the monthly table by (casefolded district, year, month), sorted, so a district
+    lookup is a binary-search slice. The columns keep their original values.
+    """
+    index = pd.MultiIndex.from_arrays(
+        [
+            _name_keys(monthly[cfg.col_monthly_district]),
+            monthly[cfg.col_monthly_year],
+            monthly[cfg.col_monthly_month],
+        ],
+        names=["district_key", "year", "month"],
+    )
+    return monthly.set_index(index).sort_index()
+
+
+def _coerce_numeric(values: pd.Series) -> pd.Series:
+    if is_numeric_dtype(values):
+        return values
+    return pd.to_numeric(values, errors="coerce")
+
+
 def query_monthly_precip_by_district(
     monthly: pd.DataFrame,
     cfg: WeatherConfig,
@@ -72,28 +288,37 @@ def query_monthly_precip_by_district(
     Example query:
       "total precipitation amount of district A in each August and September from year 2001 to 2005"
     """
-    df = monthly.copy()
-    district_norm = district.strip()
-    df = df[df[cfg.col_monthly_district].str.casefold() == district_norm.casefold()]
+    cols = [
+        cfg.col_monthly_year,
+        cfg.col_monthly_month,
+        cfg.col_monthly_state,
+        cfg.col_monthly_district,
+        cfg.col_monthly_precip,
+    ]
+    key = district.strip().casefold()
+    if not key or key not in monthly.index.levels[0]:
+        return monthly.iloc[:0][cols].reset_index(drop=True)
+
+    # monthly is indexed and sorted by (district key, year, month), see _index_monthly, so the
+    # district is a binary-search slice that already comes out in year/month order. The
+    # month filter then only scans that district's rows.
+    lo, hi = monthly.index.slice_locs((key,), (key,))
+
+    if start_year is not None or end_year is not None:
+        # Within the district the years are sorted with missing years last, so the year range
+        # is a binary search too. Missing years never match a year bound.
+        years = monthly[cfg.col_monthly_year].iloc[lo:hi].to_numpy(dtype=np.float64, na_value=np.inf)
+        if end_year is None:
+            hi = lo + years.searchsorted(np.inf)
+        else:
+            hi = lo + years.searchsorted(end_year, side="right")
+        if start_year is not None:
+            lo += years.searchsorted(start_year)
+    df = monthly.iloc[lo:hi][cols]
 
     if months is not None:
         df = df[df[cfg.col_monthly_month].isin(months)]
-
-    if start_year is not None:
-        df = df[df[cfg.col_monthly_year] >= start_year]
-    if end_year is not None:
-        df = df[df[cfg.col_monthly_year] <= end_year]
-
-    df = df.sort_values([cfg.col_monthly_year, cfg.col_monthly_month])
-    return df[
-        [
-            cfg.col_monthly_year,
-            cfg.col_monthly_month,
-            cfg.col_monthly_state,
-            cfg.col_monthly_district,
-            cfg.col_monthly_precip,
-        ]
-    ]
+    return df.reset_index(drop=True)
 
 
 def query_weekly_precip_by_state(
@@ -111,22 +336,68 @@ def query_weekly_precip_by_state(
     (we interpret 'second week of Nov 2025' as ISO week 2 within that month
      by approximation using date ranges.)
     """
-    df = daily.copy()
-    df["Year"] = df[cfg.col_daily_date].dt.year
-    df["ISO_Week"] = df[cfg.col_daily_date].dt.isocalendar().week.astype(int)
-    df["Month"] = df[cfg.col_daily_date].dt.month
-
-    state_norm = state.strip()
-    df = df[df[cfg.col_daily_state].str.casefold() == state_norm.casefold()]
-    df = df[df["Year"] == iso_year]
-    df = df[df["ISO_Week"] == iso_week]
-
-    grouped = (
-        df.groupby([cfg.col_daily_state, "Year", "ISO_Week"], as_index=False)[cfg.col_daily_precip]
-        .sum()
-        .rename(columns={cfg.col_daily_precip: "Total Weekly Precipitation"})
+    key = state.strip().casefold()
+    # daily is indexed by casefolded state name, see _index_daily; only the week's
+    # category codes are compared
+    lo, hi = _week_bounds(daily, iso_year, iso_week)
+    rows = lo + np.flatnonzero(daily.index.codes[lo:hi] == _state_codes(daily, [key])[0])
+    if not rows.size:
+        return pd.DataFrame(columns=[cfg.col_daily_state, "Year", "ISO_Week", "Total Weekly Precipitation"])
+
+    total = float(daily[cfg.col_daily_precip].to_numpy()[rows].sum())
+
+    # The state is reported as spelt in the data
+    return pd.DataFrame(
+        {
+            cfg.col_daily_state: [daily[cfg.col_daily_state].iat[rows[0]]],
+            "Year": [iso_year],
+            "ISO_Week": [iso_week],
+            "Total Weekly Precipitation": [total],
+        }
     )
-    return grouped
+
+
+def query_weekly_precip_by_states(
+    daily: pd.DataFrame,
+    cfg: WeatherConfig,
+    states: list[str],
+    iso_year: int,
+    iso_week: int,
+) -> pd.Series:
+    """
+    Total precipitation per state for a given ISO week of a year, in one pass over the table.
+
+    The result is indexed by casefolded state name; states without data are left out.
+    """
+    keys = list(dict.fromkeys(state.strip().casefold() for state in states))
+    targets = _state_codes(daily, keys)
+    lo, hi = _week_bounds(daily, iso_year, iso_week)
+    week = daily[cfg.col_daily_precip].iloc[lo:hi]
+    return week[np.isin(daily.index.codes[lo:hi], targets)].groupby(level=0, observed=True).sum()
+
+
+def _state_codes(daily: pd.DataFrame, keys: list[str]) -> np.ndarray:
+    """
+    Category codes of casefolded state keys in the daily index, -1 for unknown or blank states
+    (which matches no row). One hash lookup per key; Index.get_indexer costs far more for a few
+    keys.
+    """
+    categories = daily.index.categories
+    codes = [categories.get_loc(key) if key and key in categories else -1 for key in keys]
+    return np.array(codes, dtype=np.intp)
+
+
+def _week_bounds(daily: pd.DataFrame, iso_year: int, iso_week: int) -> Tuple[int, int]:
+    """Row range [lo, hi) of one week; daily is sorted by (Year, ISO_Week), see _index_daily."""
+    years, weeks = daily["Year"].to_numpy(), daily["ISO_Week"].to_numpy()
+    # Search with the columns' own (narrow) dtypes; a Python int makes numpy cast the column
+    try:
+        year, week = years.dtype.type(int(iso_year)), weeks.dtype.type(int(iso_week))
+    except OverflowError:
+        return 0, 0  # outside the column's range, so no rows
+    lo, hi = years.searchsorted(year, side="left"), years.searchsorted(year, side="right")
+    weeks = weeks[lo:hi]
+    return lo + weeks.searchsorted(week, side="left"), lo + weeks.searchsorted(week, side="right")
 
 
 # --- Minimal natural-language helper ---
@@ -163,6 +434,21 @@ MONTH_NAME_TO_NUM: Dict[MonthName, int] = {
 }
 
 
+# Pattern 1: district + months + year range (uses monthly table)
+# e.g. "total precipitation amount of district A in each August and September from year 2001 to 2005"
+_MONTHLY_DISTRICT_PATTERN = re.compile(
+    r"district\s+(?P<district>[a-z\s]+?)\s+in\s+each\s+(?P<months>[a-z\s,]+)\s+from\s+year\s+(?P<start>\d{4})\s+to\s+(?P<end>\d{4})"
+)
+
+# Pattern 2: compare two states in given week and month/year
+# Example target: "Compare the precipitation amount of state A and state B in the second week of Nov 2025"
+_WEEKLY_STATE_COMPARE_PATTERN = re.compile(
+    r"state\s+(?P<state_a>[a-z\s]+?)\s+and\s+state\s+(?P<state_b>[a-z\s]+?)\s+in\s+the\s+(?P<week_word>\w+)\s+week\s+of\s+(?P<month>[a-z]+)\s+(?P<year>\d{4})"
+)
+
+_MONTH_LIST_SEPARATOR = re.compile(r"[,\s]+")
+
+
 def parse_question(question: str) -> Dict[str, Any]:
     """
     Very small rule-based parser that recognises patterns similar to the examples.
@@ -171,20 +457,14 @@ def parse_question(question: str) -> Dict[str, Any]:
       - type: "monthly_district" or "weekly_state" or "unknown"
       - parameters needed for the query.
     """
-    import re
-
     q = question.strip().lower()
 
-    # Pattern 1: district + months + year range (uses monthly table)
-    # e.g. "total precipitation amount of district A in each August and September from year 2001 to 2005"
-    m = re.search(
-        r"district\s+(?P<district>[a-z\s]+?)\s+in\s+each\s+(?P<months>[a-z\s,]+)\s+from\s+year\s+(?P<start>\d{4})\s+to\s+(?P<end>\d{4})",
-        q,
-    )
+    # Each pattern needs these words, so questions without them skip the regex scan
+    m = _MONTHLY_DISTRICT_PATTERN.search(q) if "district" in q else None
     if m:
         district = m.group("district").strip().title()
         months_text = m.group("months")
-        month_names = [x.strip() for x in re.split(r"[,\s]+", months_text) if x.strip()]
+        month_names = [x.strip() for x in _MONTH_LIST_SEPARATOR.split(months_text) if x.strip()]
         month_nums = [
             MONTH_NAME_TO_NUM[name]
             for name in month_names
@@ -198,12 +478,7 @@ def parse_question(question: str) -> Dict[str, Any]:
             "end_year": int(m.group("end")),
         }
 
-    # Pattern 2: compare two states in given week and month/year
-    # Example target: "Compare the precipitation amount of state A and state B in the second week of Nov 2025"
-    m = re.search(
-        r"state\s+(?P<state_a>[a-z\s]+?)\s+and\s+state\s+(?P<state_b>[a-z\s]+?)\s+in\s+the\s+(?P<week_word>\w+)\s+week\s+of\s+(?P<month>[a-z]+)\s+(?P<year>\d{4})",
-        q,
-    )
+    m = _WEEKLY_STATE_COMPARE_PATTERN.search(q) if "state" in q and "week" in q else None
     if m:
         state_a = m.group("state_a").strip().title()
         state_b = m.group("state_b").strip().title()
@@ -234,12 +509,19 @@ def parse_question(question: str) -> Dict[str, Any]:
     return {"type": "unknown"}
 
 
+TableSource = Union[pd.DataFrame, Callable[[], pd.DataFrame]]
+
+
 def answer_question(
-    question: str, daily: pd.DataFrame, monthly: pd.DataFrame, cfg: Optional[WeatherConfig] = None
+    question: str, daily: TableSource, monthly: TableSource, cfg: Optional[WeatherConfig] = None
 ) -> Tuple[str, Optional[pd.DataFrame]]:
     """
     High-level helper: parse a natural-language question and compute an answer.
 
+    daily and monthly may be given as loaded tables or as zero-argument callables that load
+    them (e.g. lambda: load_daily_data(cfg)); a callable is only invoked when the question
+    needs that table.
+
     Returns a (text_answer, optional_table_df).
     """
     cfg = cfg or WeatherConfig()
@@ -247,7 +529,7 @@ def answer_question(
 
     if intent["type"] == "monthly_district":
         df = query_monthly_precip_by_district(
-            monthly=monthly,
+            monthly=monthly() if callable(monthly) else monthly,
             cfg=cfg,
             district=intent["district"],
             months=intent["months"],
@@ -269,33 +551,18 @@ def answer_question(
         return text, df
 
     if intent["type"] == "weekly_state_compare":
-        df_a = query_weekly_precip_by_state(
-            daily=daily,
+        totals = query_weekly_precip_by_states(
+            daily=daily() if callable(daily) else daily,
             cfg=cfg,
-            state=intent["state_a"],
+            states=[intent["state_a"], intent["state_b"]],
             iso_year=intent["year"],
             iso_week=intent["iso_week"],
         )
-        df_b = query_weekly_precip_by_state(
-            daily=daily,
-            cfg=cfg,
-            state=intent["state_b"],
-            iso_year=intent["year"],
-            iso_week=intent["iso_week"],
-        )
-        if df_a.empty and df_b.empty:
+        if totals.empty:
             return "No weekly precipitation data found for the requested states/week.", None
 
-        total_a = (
-            df_a["Total Weekly Precipitation"].iloc[0]
-            if "Total Weekly Precipitation" in df_a.columns and not df_a.empty
-            else 0.0
-        )
-        total_b = (
-            df_b["Total Weekly Precipitation"].iloc[0]
-            if "Total Weekly Precipitation" in df_b.columns and not df_b.empty
-            else 0.0
-        )
+        total_a = totals.get(intent["state_a"].casefold(), 0.0)
+        total_b = totals.get(intent["state_b"].casefold(), 0.0)
 
         comparison = pd.DataFrame(
             {
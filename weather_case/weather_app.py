@@ -1,9 +1,11 @@
+import hashlib
 import io
 
 import pandas as pd
+import pyarrow as pa
 import streamlit as st
 
-from weather_analysis import WeatherConfig, load_weather_data, answer_question
+from weather_analysis import WeatherConfig, answer_question, load_daily_data, load_monthly_data
 
 
 st.set_page_config(page_title="Weather Precipitation Assistant", layout="wide")
@@ -15,32 +17,37 @@ st.markdown(
 )
 
 
-@st.cache_data(show_spinner=False)
-def _load_data_from_bytes(data: bytes, filename: str):
-    cfg = WeatherConfig(excel_path=filename)
-    # pandas can read from a file-like object; we still pass cfg.excel_path only for metadata
-    xls = pd.ExcelFile(io.BytesIO(data))
-    daily = pd.read_excel(xls, sheet_name=cfg.daily_sheet)
-    monthly = pd.read_excel(xls, sheet_name=cfg.monthly_sheet)
-
-    # Reuse normalisation logic by mimicking load_weather_data
-    from weather_analysis import (
-        WeatherConfig as _Cfg,
-        load_weather_data as _load_from_path,
-    )
-
-    # Write to an in-memory buffer as a workaround to reuse existing function
-    # (simpler for this small demo than refactoring the library code).
-    tmp_buf = io.BytesIO()
-    with pd.ExcelWriter(tmp_buf, engine="openpyxl") as writer:
-        daily.to_excel(writer, sheet_name=cfg.daily_sheet, index=False)
-        monthly.to_excel(writer, sheet_name=cfg.monthly_sheet, index=False)
-    tmp_buf.seek(0)
-
-    # load_weather_data accepts anything that pandas.ExcelFile accepts (including BytesIO)
-    cfg2 = _Cfg(excel_path=tmp_buf)
-    daily_norm, monthly_norm = _load_from_path(cfg2)
-    return daily_norm, monthly_norm
+@st.cache_data(persist="disk", max_entries=16, show_spinner=False)
+def _load_sheet_by_hash(digest: str, sheet: str, _data: bytes) -> bytes:
+    # Keyed on the content digest and sheet only: the leading underscore tells Streamlit not
+    # to hash the (large) upload bytes. Persisted to disk, so restarts skip re-parsing too.
+    # The loaders accept anything that pandas.ExcelFile accepts (including BytesIO).
+    # Cached as an Arrow IPC stream rather than a DataFrame: Streamlit pickles every cached
+    # value on each hit, and a bytes value pickles as a plain copy.
+    load = load_daily_data if sheet == "daily" else load_monthly_data
+    table = pa.Table.from_pandas(load(WeatherConfig(excel_path=io.BytesIO(_data))))
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _load_sheet(digest: str, sheet: str, data: bytes) -> pd.DataFrame:
+    # Arrow restores the index and column dtypes from the pandas metadata, except that
+    # nullable integer index levels (the monthly year/month) come back as plain ints, so
+    # those levels are cast back to their recorded dtypes.
+    table = pa.ipc.open_stream(_load_sheet_by_hash(digest, sheet, data)).read_all()
+    df = table.to_pandas()
+    dtypes = {
+        c["field_name"]: c["numpy_type"]
+        for c in table.schema.pandas_metadata["columns"]
+        if c["pandas_type"] != "categorical"  # numpy_type is the codes' dtype
+    }
+    if isinstance(df.index, pd.MultiIndex):
+        df.index = df.index.set_levels([level.astype(dtypes.get(level.name, level.dtype)) for level in df.index.levels])
+    elif df.index.name in dtypes:
+        df.index = df.index.astype(dtypes[df.index.name])
+    return df
 
 
 uploaded = st.file_uploader(
@@ -70,8 +77,13 @@ if run_btn:
     else:
         data = uploaded.read()
         with st.spinner("Loading data and answering your question..."):
-            daily_df, monthly_df = _load_data_from_bytes(data, uploaded.name)
-            text_answer, table = answer_question(question, daily=daily_df, monthly=monthly_df)
+            digest = hashlib.sha1(data).hexdigest()
+            # Only the sheet the question needs is parsed
+            text_answer, table = answer_question(
+                question,
+                daily=lambda: _load_sheet(digest, "daily", data),
+                monthly=lambda: _load_sheet(digest, "monthly", data),
+            )
 
         st.subheader("Answer")
         st.write(text_answer)
@@ -80,9 +92,10 @@ if run_btn:
             st.subheader("Result table")
             st.dataframe(table)
 
-            # Allow download as Excel
+            # Allow download as Excel. No constant_memory: pandas writes cell by cell down each
+            # column, which that xlsxwriter mode does not support.
             out_buf = io.BytesIO()
-            with pd.ExcelWriter(out_buf, engine="openpyxl") as writer:
+            with pd.ExcelWriter(out_buf, engine="xlsxwriter") as writer:
                 table.to_excel(writer, sheet_name="Answer", index=False)
             out_buf.seek(0)
 
@@ -92,6 +105,12 @@ if run_btn:
                 file_name="weather_answer.xlsx",
                 mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             )
+            st.download_button(
+                "Download table as CSV",
+                data=table.to_csv(index=False).encode("utf-8"),
+                file_name="weather_answer.csv",
+                mime="text/csv",
+            )
         else:
             st.info("No data matched your question. Try adjusting the wording or data range.")
 